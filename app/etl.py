@@ -1,70 +1,498 @@
+import asyncio
 import os
+import re
 import time
+from functools import lru_cache, partial
+from itertools import repeat
 from pathlib import Path
+from typing import Final
 
-import pandas as pd
 import psycopg2
-from neo4j import GraphDatabase
-
-
-PG_RETRY_SECONDS = 2
-NEO4J_RETRY_SECONDS = 2
+from neo4j import AsyncGraphDatabase
+
+
+# Seconds between readiness probes: exponential backoff capped at 8s
+RETRY_DELAYS = (0.5, 1, 2, 4)
+MAX_RETRY_DELAY = 8
+
+# Rows per extracted chunk. Each chunk is sent as a single UNWIND statement
+# and committed in one managed write transaction, so this also bounds the
+# MERGEs a node-load transaction holds (IN_FLIGHT of them run at once).
+# Relationship loads run two MATCHes per row, so apoc splits them into
+# smaller inner batches to bound transaction memory.
+BATCH_SIZE = 10000
+REL_BATCH_SIZE = 5000
+
+# Postgres event_type -> relationship type between Customer and Product
+EVENT_REL_TYPES = {
+    "view": "VIEW",
+    "click": "CLICK",
+    "add_to_cart": "ADD_TO_CART",
+}
+
+# Chunks being written to Neo4j at once per table. Each pipeline reads its
+# next chunk from Postgres while the slots are busy, so extraction keeps
+# one chunk ahead of the writers. Node-only loads touch disjoint nodes and
+# can run side by side.
+IN_FLIGHT = 8
+# Loads that MERGE edges onto a few shared nodes (categories, customers,
+# products) deadlock with each other, and every retry replays the whole
+# chunk, so they write one chunk at a time. The event types share one set
+# of slots between them but each still prefetches its own next chunk.
+# apoc.periodic.iterate commits its inner batches serially for the same
+# reason, so the relationship loads have a single writer.
+EDGE_IN_FLIGHT = 1
+
+# UNWIND statements for the node loads. Each takes one `$<column>` list
+# parameter per selected column.
+CATEGORY_UPSERT: Final = """
+UNWIND range(0, size($id) - 1) AS i
+MERGE (c:Category {id: $id[i]})
+SET c.name = $name[i]
+"""
+
+PRODUCT_UPSERT: Final = """
+UNWIND range(0, size($id) - 1) AS i
+MERGE (p:Product {id: $id[i]})
+SET p.name = $name[i],
+    p.price = $price[i]
+WITH p, i
+WHERE $category_id[i] IS NOT NULL
+MERGE (c:Category {id: $category_id[i]})
+MERGE (p)-[:IN_CATEGORY]->(c)
+"""
+
+CUSTOMER_UPSERT: Final = """
+UNWIND range(0, size($id) - 1) AS i
+MERGE (c:Customer {id: $id[i]})
+SET c.name = $name[i],
+    c.join_date = $join_date[i]
+"""
+
+ORDER_UPSERT: Final = """
+UNWIND range(0, size($id) - 1) AS i
+MERGE (o:Order {id: $id[i]})
+SET o.ts = $ts[i]
+WITH o, i
+WHERE $customer_id[i] IS NOT NULL
+MERGE (c:Customer {id: $customer_id[i]})
+MERGE (c)-[:PLACED]->(o)
+"""
+
+# Per-row statements for the apoc.periodic.iterate relationship loads; they
+# see the row index as `i`.
+CONTAINS_MERGE: Final = """
+MATCH (o:Order {id: $order_id[i]})
+MATCH (p:Product {id: $product_id[i]})
+MERGE (o)-[r:CONTAINS]->(p)
+SET r.quantity = $quantity[i]
+"""
+
+EVENT_MERGE: Final = """
+MATCH (c:Customer {id: $customer_id[i]})
+MATCH (p:Product {id: $product_id[i]})
+CALL apoc.merge.relationship(
+    c, $relType, {}, {ts: $ts[i]}, p, {ts: $ts[i]}
+)
+YIELD rel
+RETURN count(rel)
+"""
+
+# Outer statement submitting one of the per-row statements above
+APOC_ITERATE: Final = """
+CALL apoc.periodic.iterate(
+    "UNWIND range(0, $n - 1) AS i RETURN i",
+    $inner,
+    {batchSize: $batch, parallel: false, retries: 3, params: $params}
+)
+YIELD failedBatches, failedOperations, errorMessages
+RETURN failedBatches, failedOperations, errorMessages
+"""
+
+# LOAD CSV variants used by the bulk loader (ETL_LOADER=csv). CSV values
+# arrive as strings, so numbers and temporal values are converted explicitly
+# (dump_to_csv() pins Postgres to ISO output in UTC, e.g.
+# "2024-04-01 10:15:00+00"); Neo4j batches the writes server-side with
+# CALL { ... } IN TRANSACTIONS.
+CATEGORY_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MERGE (c:Category {id: row.id})
+    SET c.name = row.name
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+PRODUCT_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MERGE (p:Product {id: row.id})
+    SET p.name = row.name,
+        p.price = toFloat(row.price)
+    WITH p, row
+    WHERE row.category_id IS NOT NULL
+    MERGE (c:Category {id: row.category_id})
+    MERGE (p)-[:IN_CATEGORY]->(c)
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+CUSTOMER_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MERGE (c:Customer {id: row.id})
+    SET c.name = row.name,
+        c.join_date = date(row.join_date)
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+ORDER_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MERGE (o:Order {id: row.id})
+    SET o.ts = datetime(replace(row.ts, " ", "T"))
+    WITH o, row
+    WHERE row.customer_id IS NOT NULL
+    MERGE (c:Customer {id: row.customer_id})
+    MERGE (c)-[:PLACED]->(o)
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+CONTAINS_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MATCH (o:Order {id: row.order_id})
+    MATCH (p:Product {id: row.product_id})
+    MERGE (o)-[r:CONTAINS]->(p)
+    SET r.quantity = toInteger(row.quantity)
+} IN TRANSACTIONS OF 5000 ROWS
+"""
+
+EVENT_CSV: Final = """
+LOAD CSV WITH HEADERS FROM $url AS row
+CALL {
+    WITH row
+    MATCH (c:Customer {id: row.customer_id})
+    MATCH (p:Product {id: row.product_id})
+    WITH c, p, datetime(replace(row.ts, " ", "T")) AS ts
+    CALL apoc.merge.relationship(c, $relType, {}, {ts: ts}, p, {ts: ts})
+    YIELD rel
+    RETURN count(rel) AS merged
+} IN TRANSACTIONS OF 5000 ROWS
+RETURN sum(merged)
+"""
+
+# Source queries, shared by the Bolt and CSV loaders
+CATEGORIES_SQL: Final = "SELECT id, name FROM categories"
+PRODUCTS_SQL: Final = (
+    "SELECT id, name, price::float8 AS price, category_id FROM products"
+)
+CUSTOMERS_SQL: Final = "SELECT id, name, join_date FROM customers"
+ORDERS_SQL: Final = "SELECT id, customer_id, ts FROM orders"
+ORDER_ITEMS_SQL: Final = "SELECT order_id, product_id, quantity FROM order_items"
+# Events collapse to one row per (customer, product) pair, keeping the
+# latest ts, so each relationship is merged and written once. The other
+# tables are keyed by their primary keys and cannot repeat.
+EVENTS_SQL: Final = (
+    "SELECT customer_id, product_id, max(ts) AS ts FROM events "
+    "WHERE event_type = %s GROUP BY customer_id, product_id"
+)
+
+# Node-load templates whose plans are warmed before loading
+TEMPLATES: Final = (CATEGORY_UPSERT, PRODUCT_UPSERT, CUSTOMER_UPSERT, ORDER_UPSERT)
+
+QUERIES_PATH: Final = Path(__file__).with_name("queries.cypher")
+
+# "bolt" streams chunks over the driver; "csv" dumps each table with COPY
+# into CSV_DIR, which must be Neo4j's import directory, and uses LOAD CSV.
+ETL_LOADERS: Final = ("bolt", "csv")
+ETL_LOADER = os.environ.get("ETL_LOADER", "bolt")
+CSV_DIR = Path(os.environ.get("CSV_DIR", "/work/import"))
+
+
+def retry_delays():
+    """Yield the sleep before each readiness probe (the first is immediate)."""
+    yield 0
+    yield from RETRY_DELAYS
+    yield from repeat(MAX_RETRY_DELAY)
+
+
+def connect_postgres():
+    """Open a new PostgreSQL connection from the environment settings."""
+    return psycopg2.connect(
+        host=os.environ.get("POSTGRES_HOST", "postgres"),
+        dbname=os.environ.get("POSTGRES_DB", "shop"),
+        user=os.environ.get("POSTGRES_USER", "app"),
+        password=os.environ.get("POSTGRES_PASSWORD", "app"),
+    )
 
 
 def wait_for_postgres():
-    """Wait until PostgreSQL accepts connections."""
-    while True:
+    """Wait until PostgreSQL accepts connections and return the open one."""
+    for delay in retry_delays():
+        time.sleep(delay)
         try:
-            conn = psycopg2.connect(
-                host=os.environ.get("POSTGRES_HOST", "postgres"),
-                dbname=os.environ.get("POSTGRES_DB", "shop"),
-                user=os.environ.get("POSTGRES_USER", "app"),
-                password=os.environ.get("POSTGRES_PASSWORD", "app"),
-            )
-            conn.close()
+            conn = connect_postgres()
             print("Postgres is ready.")
-            break
+            return conn
         except Exception as e:
             print(f"Waiting for Postgres... ({e})")
-            time.sleep(PG_RETRY_SECONDS)
 
 
-def wait_for_neo4j():
-    """Wait until Neo4j accepts Bolt connections."""
-    uri = os.environ.get("NEO4J_URI", "bolt://neo4j:7687")
-    user = os.environ.get("NEO4J_USER", "neo4j")
-    password = os.environ.get("NEO4J_PASSWORD", "password")
+async def wait_for_neo4j():
+    """
+    Wait until Neo4j accepts Bolt connections and return the async driver.
 
-    while True:
+    A single driver (and its connection pool) is reused across probes.
+    """
+    driver = AsyncGraphDatabase.driver(
+        os.environ.get("NEO4J_URI", "bolt://neo4j:7687"),
+        auth=(
+            os.environ.get("NEO4J_USER", "neo4j"),
+            os.environ.get("NEO4J_PASSWORD", "password"),
+        ),
+    )
+    for delay in retry_delays():
+        await asyncio.sleep(delay)
         try:
-            driver = GraphDatabase.driver(uri, auth=(user, password))
-            with driver.session() as session:
-                session.run("RETURN 1")
-            driver.close()
+            await driver.verify_connectivity()
             print("Neo4j is ready.")
-            break
+            return driver
         except Exception as e:
             print(f"Waiting for Neo4j... ({e})")
-            time.sleep(NEO4J_RETRY_SECONDS)
 
 
-def run_cypher(session, query, parameters=None):
+async def run_cypher(session, query, parameters=None):
     """Run a single Cypher query."""
-    session.run(query, parameters or {})
+    await session.run(query, parameters or {})
 
 
-def run_cypher_file(session, path: Path):
-    """Run all Cypher statements contained in a .cypher file."""
-    text = path.read_text(encoding="utf-8")
-    statements = [s.strip() for s in text.split(";") if s.strip()]
-    for stmt in statements:
-        session.run(stmt)
+def split_cypher(text):
+    """
+    Split a Cypher script into statements on top-level `;`.
 
+    Semicolons inside '...', "..." or `...` literals are kept, and `//` and
+    `/* */` comments are dropped, so neither can cut a statement in two.
+    """
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            current.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < len(text):
+                current.append(text[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = len(text) if end == -1 else end
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end == -1 else end + 2
+            continue
+        elif ch in "'\"`":
+            quote = ch
+            current.append(ch)
+        elif ch == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statements.append("".join(current).strip())
+    return [stmt for stmt in statements if stmt]
+
+
+async def warm_plan_cache(session):
+    """
+    Run every UNWIND template once with empty columns, so Neo4j compiles and
+    caches its plan before the first real chunk arrives. The apoc
+    relationship statements are planned by apoc itself and are not warmed.
+    """
+    for cypher in TEMPLATES:
+        params = {name: [] for name in re.findall(r"\$(\w+)", cypher)}
+        result = await session.run(cypher, params)
+        await result.consume()
 
-def chunk(df, size=1000):
-    """Yield DataFrame chunks of at most `size` rows."""
-    for start in range(0, len(df), size):
-        yield df.iloc[start : start + size]
+
+async def _run_statement(tx, stmt):
+    """Transaction function: run `stmt` and discard its result."""
+    result = await tx.run(stmt)
+    await result.consume()
+
+
+@lru_cache
+def parse_cypher_file(path: Path):
+    """Read and split a .cypher file once; returns a tuple of statements."""
+    return tuple(split_cypher(path.read_text(encoding="utf-8")))
+
+
+async def run_cypher_file(session, path: Path):
+    """
+    Run all Cypher statements contained in a .cypher file.
+
+    Each statement gets its own managed transaction: Neo4j refuses to mix
+    schema changes and data writes (the dev-only DETACH DELETE) in one.
+    """
+    for stmt in parse_cypher_file(path):
+        await session.execute_write(_run_statement, stmt)
+
+
+async def run_apoc_iterate(tx, inner, cols, batch=1000, params=None):
+    """
+    Load the columnar chunk `cols` through apoc.periodic.iterate so Neo4j
+    splits the work into batches of `batch` rows and commits them one after
+    another. `inner` is the per-row statement: it sees the row index as
+    `i`, every column as a `$<name>` list, and any extra `params`.
+
+    apoc does not raise when inner batches still fail after its own
+    retries, it only reports them, so any failed batch raises RuntimeError
+    here.
+    """
+    result = await tx.run(
+        APOC_ITERATE,
+        {
+            "inner": inner,
+            "batch": batch,
+            "params": {**(params or {}), **cols, "n": chunk_size(cols)},
+        },
+    )
+    report = await result.single()
+    errors = report["errorMessages"]
+    if report["failedBatches"] or errors:
+        raise RuntimeError(
+            f"apoc.periodic.iterate: {report['failedBatches']} batches "
+            f"({report['failedOperations']} rows) failed: {errors}"
+        )
+
+
+def extract_stream(query, pg_conn, query_params=None, size=BATCH_SIZE):
+    """
+    Stream the result of `query` through a server-side cursor, as columnar
+    chunks of at most `size` rows: `{column_name: [values...]}`.
+
+    Sending one list per column instead of one map per row avoids a dict
+    per row in Python and repeated map keys on the wire; the Cypher side
+    indexes the lists with `UNWIND range(0, size($<column>) - 1) AS i`.
+    """
+    with pg_conn, pg_conn.cursor(name="etl") as cur:
+        cur.itersize = size
+        cur.execute(query, query_params)
+        names = None
+        while batch := cur.fetchmany(size):
+            names = names or [col.name for col in cur.description]
+            yield dict(zip(names, map(list, zip(*batch))))
+
+
+def chunk_size(cols):
+    """Number of rows in the columnar chunk `cols`."""
+    return len(next(iter(cols.values())))
+
+
+async def load_batch(tx, cypher, cols):
+    """
+    Transaction function: load one columnar chunk, passing each column as a
+    parameter.
+    """
+    await tx.run(cypher, cols)
+
+
+async def load_rel_batch(tx, inner, cols):
+    """
+    Transaction function: load one chunk of relationships through
+    apoc.periodic.iterate.
+    """
+    await run_apoc_iterate(tx, inner, cols, batch=REL_BATCH_SIZE)
+
+
+async def load_event_batch(tx, inner, cols, rel_type):
+    """Transaction function: load one chunk of events as `$relType`."""
+    await run_apoc_iterate(
+        tx,
+        inner,
+        cols,
+        batch=REL_BATCH_SIZE,
+        params={"relType": rel_type},
+    )
+
+
+async def run_pipeline(
+    driver, pg_conn, query, load, cypher, query_params=None, slots=None
+):
+    """
+    Stream `query` from Postgres and load it into Neo4j concurrently.
+
+    Chunks are extracted on a worker thread, so the blocking psycopg2 cursor
+    never stalls the event loop. Each chunk costs one round trip: the
+    transaction function `load(tx, cypher, cols)` sends it as a single
+    statement inside one managed write transaction on its own session.
+    Writes are bounded by the `slots` semaphore (default: IN_FLIGHT slots
+    per call); pass a shared semaphore to cap several pipelines together.
+    Only the write waits for a slot: the next chunk is read while the
+    current ones load, so at most one extra chunk is held per pipeline.
+    Transient errors are retried by the driver.
+
+    If a chunk fails, the remaining loads are cancelled and awaited before
+    the error propagates as an ExceptionGroup, so nothing is left writing
+    through the driver once this returns.
+    """
+    slots = slots or asyncio.Semaphore(IN_FLIGHT)
+
+    async def load_chunk(cols):
+        try:
+            async with driver.session(database="neo4j", fetch_size=1000) as session:
+                await session.execute_write(load, cypher, cols)
+        finally:
+            slots.release()
+
+    async def next_chunk():
+        fetch = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+        try:
+            return await asyncio.shield(fetch)
+        except asyncio.CancelledError:
+            # The worker thread can't be interrupted; let it leave the
+            # generator before the generator is closed below.
+            await asyncio.wait([fetch])
+            raise
+
+    chunks = extract_stream(query, pg_conn, query_params)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            while (cols := await next_chunk()) is not None:
+                await slots.acquire()
+                tg.create_task(load_chunk(cols))
+    finally:
+        chunks.close()
+
+
+async def load_events(driver, event_type, cypher, slots):
+    """
+    Stream the events of one `event_type` and load them as the matching
+    relationship type. Uses its own Postgres connection so the event types
+    can be extracted in parallel; `slots` is shared between the event types
+    to bound how many chunks they write at once.
+    """
+    pg_conn = await asyncio.to_thread(connect_postgres)
+    try:
+        await run_pipeline(
+            driver,
+            pg_conn,
+            EVENTS_SQL,
+            partial(load_event_batch, rel_type=EVENT_REL_TYPES[event_type]),
+            cypher,
+            query_params=(event_type,),
+            slots=slots,
+        )
+    finally:
+        pg_conn.close()
 
 
 def etl():
@@ -74,9 +502,14 @@ def etl():
     This function performs the complete Extract, Transform, Load process:
     1. Waits for both databases to be ready
     2. Sets up Neo4j schema using queries.cypher file
-    3. Extracts data from PostgreSQL tables
+    3. Streams the needed columns of each PostgreSQL table in chunks
+       through server-side cursors
     4. Transforms relational data into graph format
-    5. Loads data into Neo4j with appropriate relationships
+    5. Loads the chunks into Neo4j through the async driver, keeping several
+       transactions in flight while the next ones are being extracted
+
+    With ETL_LOADER=csv, steps 3-5 instead dump each table to CSV with COPY
+    and let Neo4j bulk-load the files with LOAD CSV.
 
     The process creates the following graph structure:
     - Category nodes with name properties
@@ -86,164 +519,151 @@ def etl():
     - Order-Product relationships via CONTAINS with quantity properties
     - Dynamic event relationships between customers and products
     """
-    # Ensure dependencies are ready (useful when running in docker-compose)
-    wait_for_postgres()
-    wait_for_neo4j()
+    asyncio.run(etl_async())
 
-    # Get path to your Cypher schema file
-    queries_path = Path(__file__).with_name("queries.cypher")
-    print(f"Using Cypher schema from: {queries_path}")
 
-    # --- Connect to Postgres
-    pg_conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "postgres"),
-        dbname=os.environ.get("POSTGRES_DB", "shop"),
-        user=os.environ.get("POSTGRES_USER", "app"),
-        password=os.environ.get("POSTGRES_PASSWORD", "app"),
+def dump_to_csv(pg_conn, query, path, query_params=None):
+    """Write the result of `query` to `path` as CSV with a header row."""
+    with pg_conn, pg_conn.cursor() as cur, open(path, "wb") as f:
+        # Fixed temporal rendering, so the LOAD CSV templates can parse it
+        cur.execute("SET LOCAL DateStyle = 'ISO'")
+        cur.execute("SET LOCAL TimeZone = 'UTC'")
+        sql = cur.mogrify(query, query_params).decode()
+        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH CSV HEADER", f)
+
+
+async def load_csv(driver, pg_conn, name, query, cypher, query_params=None, **params):
+    """
+    Dump `query` to `<CSV_DIR>/<name>.csv` with COPY, then load it in one
+    auto-commit LOAD CSV statement (required by IN TRANSACTIONS). The file
+    is removed afterwards, whether or not the load succeeded.
+    """
+    path = CSV_DIR / f"{name}.csv"
+    try:
+        await asyncio.to_thread(dump_to_csv, pg_conn, query, path, query_params)
+        async with driver.session(database="neo4j") as session:
+            result = await session.run(
+                cypher, {"url": f"file:///{path.name}", **params}
+            )
+            await result.consume()
+    finally:
+        path.unlink(missing_ok=True)
+
+
+async def load_over_bolt(driver, pg_conn):
+    """Load every table by streaming chunks through the driver."""
+    # 2) Load categories
+    print("Loading categories...")
+    await run_pipeline(driver, pg_conn, CATEGORIES_SQL, load_batch, CATEGORY_UPSERT)
+
+    # 3) Load products + IN_CATEGORY (creates missing Category stubs)
+    print("Loading products...")
+    await run_pipeline(
+        driver,
+        pg_conn,
+        PRODUCTS_SQL,
+        load_batch,
+        PRODUCT_UPSERT,
+        slots=asyncio.Semaphore(EDGE_IN_FLIGHT),
     )
 
-    # --- Connect to Neo4j
-    driver = GraphDatabase.driver(
-        os.environ.get("NEO4J_URI", "bolt://neo4j:7687"),
-        auth=(
-            os.environ.get("NEO4J_USER", "neo4j"),
-            os.environ.get("NEO4J_PASSWORD", "password"),
-        ),
+    # 4) Load customers
+    print("Loading customers...")
+    await run_pipeline(driver, pg_conn, CUSTOMERS_SQL, load_batch, CUSTOMER_UPSERT)
+
+    # 5) Load orders + PLACED (creates missing Customer stubs)
+    print("Loading orders...")
+    await run_pipeline(
+        driver,
+        pg_conn,
+        ORDERS_SQL,
+        load_batch,
+        ORDER_UPSERT,
+        slots=asyncio.Semaphore(EDGE_IN_FLIGHT),
     )
 
+    # 6) Load order_items as CONTAINS
+    print("Loading order items...")
+    await run_pipeline(
+        driver,
+        pg_conn,
+        ORDER_ITEMS_SQL,
+        load_rel_batch,
+        CONTAINS_MERGE,
+        slots=asyncio.Semaphore(EDGE_IN_FLIGHT),
+    )
+
+    # 7) Load events as VIEW / CLICK / ADD_TO_CART relationships,
+    #    one parallel extract + load per event type, sharing write slots
+    print("Loading events...")
+    event_slots = asyncio.Semaphore(EDGE_IN_FLIGHT)
+    async with asyncio.TaskGroup() as tg:
+        for event_type in EVENT_REL_TYPES:
+            tg.create_task(load_events(driver, event_type, EVENT_MERGE, event_slots))
+
+
+async def load_over_csv(driver, pg_conn):
+    """Load every table with COPY ... TO STDOUT and LOAD CSV."""
+    print("Loading categories...")
+    await load_csv(driver, pg_conn, "categories", CATEGORIES_SQL, CATEGORY_CSV)
+
+    print("Loading products...")
+    await load_csv(driver, pg_conn, "products", PRODUCTS_SQL, PRODUCT_CSV)
+
+    print("Loading customers...")
+    await load_csv(driver, pg_conn, "customers", CUSTOMERS_SQL, CUSTOMER_CSV)
+
+    print("Loading orders...")
+    await load_csv(driver, pg_conn, "orders", ORDERS_SQL, ORDER_CSV)
+
+    print("Loading order items...")
+    await load_csv(driver, pg_conn, "order_items", ORDER_ITEMS_SQL, CONTAINS_CSV)
+
+    print("Loading events...")
+    for event_type, rel_type in EVENT_REL_TYPES.items():
+        await load_csv(
+            driver,
+            pg_conn,
+            f"events_{event_type}",
+            EVENTS_SQL,
+            EVENT_CSV,
+            query_params=(event_type,),
+            relType=rel_type,
+        )
+
+
+async def etl_async():
+    """Async body of `etl()`."""
+    if ETL_LOADER not in ETL_LOADERS:
+        raise ValueError(
+            f"ETL_LOADER must be one of {', '.join(ETL_LOADERS)}, got {ETL_LOADER!r}"
+        )
+
+    # Ensure dependencies are ready (useful when running in docker-compose)
+    # and keep the connections that answered for the load itself
+    pg_conn = await asyncio.to_thread(wait_for_postgres)
+    driver = await wait_for_neo4j()
+
+    print(f"Using Cypher schema from: {QUERIES_PATH}")
+
     try:
-        with driver.session() as session:
-            # 1) Apply schema
-            print("Applying Neo4j schema...")
-            run_cypher_file(session, queries_path)
-
-            # 2) Extract from Postgres
-            print("Reading tables from Postgres...")
-            customers = pd.read_sql("SELECT * FROM customers", pg_conn)
-            categories = pd.read_sql("SELECT * FROM categories", pg_conn)
-            products = pd.read_sql("SELECT * FROM products", pg_conn)
-            orders = pd.read_sql("SELECT * FROM orders", pg_conn)
-            order_items = pd.read_sql("SELECT * FROM order_items", pg_conn)
-            events = pd.read_sql("SELECT * FROM events", pg_conn)
-
-            # 3) Load categories
-            print("Loading categories...")
-            for df in chunk(categories, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MERGE (c:Category {id: row.id})
-                    SET c.name = row.name
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            # 4) Load products + IN_CATEGORY
-            print("Loading products...")
-            for df in chunk(products, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MERGE (p:Product {id: row.id})
-                    SET p.name = row.name,
-                        p.price = row.price
-                    WITH p, row
-                    MATCH (c:Category {id: row.category_id})
-                    MERGE (p)-[:IN_CATEGORY]->(c)
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            # 5) Load customers
-            print("Loading customers...")
-            for df in chunk(customers, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MERGE (c:Customer {id: row.id})
-                    SET c.name = row.name,
-                        c.join_date = row.join_date
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            # 6) Load orders + PLACED
-            print("Loading orders...")
-            for df in chunk(orders, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MERGE (o:Order {id: row.id})
-                    SET o.ts = row.ts
-                    WITH o, row
-                    MATCH (c:Customer {id: row.customer_id})
-                    MERGE (c)-[:PLACED]->(o)
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            # 7) Load order_items as CONTAINS
-            print("Loading order items...")
-            for df in chunk(order_items, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MATCH (o:Order {id: row.order_id})
-                    MATCH (p:Product {id: row.product_id})
-                    MERGE (o)-[r:CONTAINS]->(p)
-                    SET r.quantity = row.quantity
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            # 8) Load events as VIEW / CLICK / ADD_TO_CART relationships
-
-            print("Loading VIEW events...")
-            view_df = events[events["event_type"] == "view"]
-            for df in chunk(view_df, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MATCH (c:Customer {id: row.customer_id})
-                    MATCH (p:Product {id: row.product_id})
-                    MERGE (c)-[r:VIEW]->(p)
-                    SET r.ts = row.ts
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            print("Loading CLICK events...")
-            click_df = events[events["event_type"] == "click"]
-            for df in chunk(click_df, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MATCH (c:Customer {id: row.customer_id})
-                    MATCH (p:Product {id: row.product_id})
-                    MERGE (c)-[r:CLICK]->(p)
-                    SET r.ts = row.ts
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
-
-            print("Loading ADD_TO_CART events...")
-            atc_df = events[events["event_type"] == "add_to_cart"]
-            for df in chunk(atc_df, 100):
-                session.run(
-                    """
-                    UNWIND $rows AS row
-                    MATCH (c:Customer {id: row.customer_id})
-                    MATCH (p:Product {id: row.product_id})
-                    MERGE (c)-[r:ADD_TO_CART]->(p)
-                    SET r.ts = row.ts
-                    """,
-                    {"rows": df.to_dict("records")},
-                )
+        # 1) Apply schema
+        print("Applying Neo4j schema...")
+        async with driver.session(database="neo4j") as session:
+            await run_cypher_file(session, QUERIES_PATH)
+            # Only the Bolt loader sends the UNWIND templates
+            if ETL_LOADER == "bolt":
+                await warm_plan_cache(session)
+
+        if ETL_LOADER == "csv":
+            await load_over_csv(driver, pg_conn)
+        else:
+            await load_over_bolt(driver, pg_conn)
 
         print("ETL done.")
     finally:
         pg_conn.close()
-        driver.close()
+        await driver.close()
 
 
 if __name__ == "__main__":
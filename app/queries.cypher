@@ -14,3 +14,7 @@ FOR (cat:Category) REQUIRE cat.id IS UNIQUE;
 
 CREATE CONSTRAINT order_id IF NOT EXISTS
 FOR (o:Order) REQUIRE o.id IS UNIQUE;
+
+// ---- Block until the constraint-backed indexes are ONLINE, so the
+// ---- MATCH-on-id loads below hit index seeks instead of label scans
+CALL db.awaitIndexes(300);
@@ -36,4 +36,7 @@ CREATE TABLE events (
   product_id TEXT REFERENCES products(id),
   event_type TEXT CHECK (event_type IN ('view','click','add_to_cart')),
   ts TIMESTAMPTZ NOT NULL
-);
\ No newline at end of file
+);
+
+-- The ETL reads events one event_type at a time
+CREATE INDEX events_type_idx ON events (event_type);
\ No newline at end of file